@@ -7,7 +7,10 @@ Architecture:
 """
 
 import asyncio
+import functools
+import logging
 import os
+import struct
 from dataclasses import dataclass
 from enum import Enum
 
@@ -17,11 +20,20 @@ try:
 except ImportError:
     print("Please install google-genai: pip install google-genai")
     raise
+from websockets.exceptions import ConnectionClosed
+
+logger = logging.getLogger(__name__)
+
+# Client-facing log levels (as sent to the browser) mapped to logging levels
+LOG_LEVELS = {"info": logging.INFO, "warn": logging.WARNING, "error": logging.ERROR}
 
 # Available voices - each has a distinct personality
 AVAILABLE_VOICES = ["Aoede", "Charon", "Fenrir", "Kore", "Puck"]
 DEFAULT_VOICE = os.getenv("GEMINI_VOICE", "Puck")
 
+# Most microphone chunks coalesced into a single send to Gemini
+MAX_SEND_BATCH_CHUNKS = 8
+
 
 class AudioFormat(Enum):
     PCM_16KHZ = "pcm_16000"
@@ -58,6 +70,29 @@ Keep it natural - you're having a conversation, not reading a script.
 """
 
 
+@functools.lru_cache(maxsize=32)
+def _build_live_config(voice: str, system_instruction: str, model: str) -> types.LiveConnectConfig:
+    """
+    Build the Live session config once per (voice, prompt, model).
+
+    These are process-static in practice, so connections reuse one config
+    instead of rebuilding it. The config is only read after construction.
+    """
+    return types.LiveConnectConfig(
+        response_modalities=["AUDIO"],
+        speech_config=types.SpeechConfig(
+            voice_config=types.VoiceConfig(
+                prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                    voice_name=voice
+                )
+            )
+        ),
+        system_instruction=types.Content(
+            parts=[types.Part(text=system_instruction)]
+        ),
+    )
+
+
 async def run_gemini_session(
     config: GeminiConfig,
     audio_queue: asyncio.Queue,
@@ -71,29 +106,22 @@ async def run_gemini_session(
     Args:
         config: GeminiConfig with API key and settings
         audio_queue: Queue to receive audio data to send to Gemini
-        response_callback: Async callback for responses (type, data)
+        response_callback: Callback for responses (type, data); called inline
+            from the receive loop, so it must not block
         shutdown_event: Event to signal session shutdown
         log_callback: Optional async callback for log messages (message, level)
     """
     async def log(msg: str, level: str = "info"):
-        print(msg)
+        logger.log(LOG_LEVELS.get(level, logging.INFO), msg)
         if log_callback:
             await log_callback(msg, level)
 
     client = genai.Client(api_key=config.api_key)
 
-    live_config = types.LiveConnectConfig(
-        response_modalities=["AUDIO"],
-        speech_config=types.SpeechConfig(
-            voice_config=types.VoiceConfig(
-                prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                    voice_name=config.voice
-                )
-            )
-        ),
-        system_instruction=types.Content(
-            parts=[types.Part(text=config.system_instruction or DEFAULT_SYSTEM_PROMPT)]
-        ),
+    live_config = _build_live_config(
+        config.voice,
+        config.system_instruction or DEFAULT_SYSTEM_PROMPT,
+        config.model
     )
 
     await log(f"🔌 Connecting to Gemini Live ({config.model})...")
@@ -107,166 +135,151 @@ async def run_gemini_session(
         async def send_audio_task():
             """Task to send audio from queue to Gemini"""
             chunks_sent = 0
-            print("🎤 Starting audio send task...")
-            while not shutdown_event.is_set():
+            mime_type = f"audio/pcm;rate={config.input_sample_rate}"
+            logger.debug("🎤 Starting audio send task...")
+            while True:
                 try:
-                    try:
-                        audio_data = await asyncio.wait_for(audio_queue.get(), timeout=0.5)
-                    except asyncio.TimeoutError:
-                        continue
+                    # Suspends until audio or the None shutdown sentinel arrives
+                    audio_data = await audio_queue.get()
 
                     if audio_data is None:
-                        print("🎤 Received shutdown signal")
+                        logger.debug("🎤 Received shutdown signal")
                         break
 
+                    # Coalesce whatever else is already queued into one send
+                    batch = [audio_data]
+                    stopping = False
+                    while len(batch) < MAX_SEND_BATCH_CHUNKS and not audio_queue.empty():
+                        audio_data = audio_queue.get_nowait()
+                        if audio_data is None:
+                            stopping = True
+                            break
+                        batch.append(audio_data)
+
+                    # Chunks are contiguous PCM at one rate, so they join into one blob
                     await session.send(
                         input=types.LiveClientRealtimeInput(
                             media_chunks=[
                                 types.Blob(
-                                    mime_type=f"audio/pcm;rate={config.input_sample_rate}",
-                                    data=audio_data
+                                    mime_type=mime_type,
+                                    data=batch[0] if len(batch) == 1 else b"".join(batch)
                                 )
                             ]
                         )
                     )
-                    chunks_sent += 1
-                    if chunks_sent % 100 == 0:
-                        print(f"🎤 Sent {chunks_sent} audio chunks")
+                    previous_sent = chunks_sent
+                    chunks_sent += len(batch)
+                    if logger.isEnabledFor(logging.DEBUG) and chunks_sent // 100 != previous_sent // 100:
+                        logger.debug("🎤 Sent %d audio chunks", chunks_sent)
+
+                    if stopping:
+                        logger.debug("🎤 Received shutdown signal")
+                        break
                 except asyncio.CancelledError:
-                    print("🎤 Send task cancelled")
+                    logger.debug("🎤 Send task cancelled")
+                    break
+                except ConnectionClosed:
+                    await log("❌ Gemini connection closed", "error")
+                    shutdown_event.set()
                     break
                 except Exception as e:
-                    error_str = str(e)
-                    if "1008" in error_str or "ConnectionClosed" in error_str:
-                        await log("❌ Gemini connection closed", "error")
-                        shutdown_event.set()
-                        break
                     await log(f"❌ Error sending audio: {e}", "error")
 
         async def receive_responses_task():
             """Task to receive responses from Gemini"""
             turn_count = 0
             try:
-                print("📡 Starting to receive responses from Gemini...")
+                logger.debug("📡 Starting to receive responses from Gemini...")
                 while not shutdown_event.is_set():
-                    try:
-                        async for response in session.receive():
-                            if shutdown_event.is_set():
-                                break
-
-                            if response.server_content:
-                                content = response.server_content
-
-                                if getattr(content, 'interrupted', False):
-                                    print("   ⚡ Interrupted")
-                                    await response_callback("interrupted", None)
-                                    continue
-
-                                if content.model_turn and content.model_turn.parts:
-                                    for part in content.model_turn.parts:
-                                        if part.inline_data:
-                                            audio_bytes = part.inline_data.data
-                                            if turn_count == 0:
-                                                print(f"   🔊 Audio chunk: {len(audio_bytes)} bytes")
-                                            await response_callback("audio", audio_bytes)
-
-                                        if part.text:
-                                            print(f"   💬 Text: {part.text[:100]}...")
-                                            await response_callback("text", part.text)
-
-                                if content.turn_complete:
-                                    turn_count += 1
-                                    print(f"   ✅ Turn {turn_count} complete")
-                                    await response_callback("turn_complete", None)
-
-                        print("📡 Receive iterator ended...")
+                    # receive() yields a single model turn, then ends
+                    async for response in session.receive():
                         if shutdown_event.is_set():
                             break
-                        await asyncio.sleep(0.1)
-
-                    except Exception as e:
-                        error_str = str(e)
-                        if "cancelled" in error_str.lower():
-                            break
-                        if "1008" in error_str or "ConnectionClosed" in error_str:
-                            await log("❌ Gemini connection lost", "error")
-                            shutdown_event.set()
-                            break
-                        await log(f"⚠️ Receive error: {e}", "warn")
-                        await asyncio.sleep(0.5)
 
-                print("📡 Receive task ending")
+                        content = response.server_content
+                        if content is None:
+                            continue
+
+                        if content.interrupted:
+                            logger.debug("   ⚡ Interrupted")
+                            response_callback("interrupted", None)
+                            continue
+
+                        model_turn = content.model_turn
+                        parts = model_turn.parts if model_turn is not None else None
+                        if parts:
+                            for part in parts:
+                                inline_data = part.inline_data
+                                if inline_data is not None:
+                                    audio_bytes = inline_data.data
+                                    if turn_count == 0:
+                                        logger.debug("   🔊 Audio chunk: %d bytes", len(audio_bytes))
+                                    response_callback("audio", audio_bytes)
+
+                                text = part.text
+                                if text:
+                                    logger.debug("   💬 Text: %.100s...", text)
+                                    response_callback("text", text)
+
+                        if content.turn_complete:
+                            turn_count += 1
+                            logger.debug("   ✅ Turn %d complete", turn_count)
+                            response_callback("turn_complete", None)
+
+                logger.debug("📡 Receive task ending")
+            except ConnectionClosed:
+                await log("❌ Gemini connection lost", "error")
             except asyncio.CancelledError:
-                print("📡 Receive task cancelled")
+                logger.debug("📡 Receive task cancelled")
             except Exception as e:
-                print(f"❌ Fatal error: {e}")
-                import traceback
-                traceback.print_exc()
-                await response_callback("error", str(e))
+                logger.exception("❌ Fatal error: %s", e)
+                response_callback("error", str(e))
+            finally:
+                shutdown_event.set()
 
         send_task = asyncio.create_task(send_audio_task())
         receive_task = asyncio.create_task(receive_responses_task())
+        shutdown_task = asyncio.create_task(shutdown_event.wait())
+        tasks = [send_task, receive_task, shutdown_task]
 
         try:
-            while not shutdown_event.is_set():
-                done, pending = await asyncio.wait(
-                    [send_task, receive_task],
-                    timeout=1.0,
-                    return_when=asyncio.FIRST_COMPLETED
-                )
+            # Sleep until either loop finishes or shutdown is requested
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
 
-                for task in done:
-                    if task.exception():
-                        print(f"Task failed: {task.exception()}")
-                        shutdown_event.set()
-                        break
-
-                if done and not pending:
-                    break
+            for task in done:
+                if task is not shutdown_task and not task.cancelled() and task.exception():
+                    logger.error("Task failed: %s", task.exception())
 
         except asyncio.CancelledError:
             pass
         finally:
             shutdown_event.set()
-            send_task.cancel()
-            receive_task.cancel()
-
-            for task in [send_task, receive_task]:
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-    print("🔌 Disconnected from Gemini")
+    logger.info("🔌 Disconnected from Gemini")
 
 
-def pcm_to_wav(pcm_data: bytes, sample_rate: int = 24000, channels: int = 1, sample_width: int = 2) -> bytes:
-    """Convert raw PCM data to WAV format"""
-    import struct
-    import io
+WAV_HEADER_FORMAT = '<4sI4s4sIHHIIHH4sI'
+WAV_HEADER_SIZE = struct.calcsize(WAV_HEADER_FORMAT)  # 44 bytes
 
-    byte_rate = sample_rate * channels * sample_width
-    block_align = channels * sample_width
-    data_size = len(pcm_data)
-    file_size = 36 + data_size
 
-    wav_buffer = io.BytesIO()
-
-    wav_buffer.write(b'RIFF')
-    wav_buffer.write(struct.pack('<I', file_size))
-    wav_buffer.write(b'WAVE')
-
-    wav_buffer.write(b'fmt ')
-    wav_buffer.write(struct.pack('<I', 16))
-    wav_buffer.write(struct.pack('<H', 1))
-    wav_buffer.write(struct.pack('<H', channels))
-    wav_buffer.write(struct.pack('<I', sample_rate))
-    wav_buffer.write(struct.pack('<I', byte_rate))
-    wav_buffer.write(struct.pack('<H', block_align))
-    wav_buffer.write(struct.pack('<H', sample_width * 8))
-
-    wav_buffer.write(b'data')
-    wav_buffer.write(struct.pack('<I', data_size))
-    wav_buffer.write(pcm_data)
+def wav_header(sample_rate: int = 24000, channels: int = 1, sample_width: int = 2, data_size: int = 0xFFFFFFFF) -> bytes:
+    """
+    Build a 44-byte WAV header for a PCM stream.
 
-    return wav_buffer.getvalue()
+    The default data_size is the streaming placeholder: the header is sent once
+    at the start of a turn, before the total length is known.
+    """
+    buffer = bytearray(WAV_HEADER_SIZE)
+    struct.pack_into(
+        WAV_HEADER_FORMAT, buffer, 0,
+        b'RIFF', min(36 + data_size, 0xFFFFFFFF), b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate,
+        sample_rate * channels * sample_width,  # byte rate
+        channels * sample_width,                # block align
+        sample_width * 8,                       # bits per sample
+        b'data', data_size
+    )
+    return bytes(buffer)
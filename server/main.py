@@ -7,21 +7,31 @@ Architecture:
 """
 
 import asyncio
-import base64
-import json
+import logging
+import logging.handlers
 import os
+import queue
+from collections import deque
 from typing import Optional
 from contextlib import asynccontextmanager
 
+import orjson
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
-from gemini_client import GeminiConfig, run_gemini_session, pcm_to_wav, DEFAULT_SYSTEM_PROMPT
+from gemini_client import GeminiConfig, run_gemini_session, wav_header, DEFAULT_SYSTEM_PROMPT
 
 # Output sample rate for native audio model
 OUTPUT_SAMPLE_RATE = 24000
 
+# Binary frame type tags (first byte of every binary WebSocket message)
+MSG_AUDIO = b"\x01"        # raw 16-bit PCM
+MSG_AUDIO_START = b"\x02"  # WAV header for a new turn
+
+# Streaming WAV header, sent once at the start of each assistant turn
+AUDIO_START_FRAME = MSG_AUDIO_START + wav_header(sample_rate=OUTPUT_SAMPLE_RATE)
+
 # Load environment variables
 load_dotenv()
 
@@ -29,16 +39,103 @@ load_dotenv()
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "8765"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+logger = logging.getLogger(__name__)
+
+
+def start_logging() -> tuple:
+    """
+    Route all logging through a queue so the event loop never blocks on
+    stdout; a background listener thread does the actual writes.
+
+    Returns (queue_handler, listener) for stop_logging.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+
+    root = logging.getLogger()
+    if root.level > logging.INFO:
+        root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+
+    # LOG_LEVEL applies to our own modules, not third-party libraries;
+    # getLevelName returns an int only for known level names
+    level = logging.getLevelName(LOG_LEVEL)
+    level_known = isinstance(level, int)
+    if not level_known:
+        level = logging.INFO
+    for name in (__name__, "gemini_client"):
+        logging.getLogger(name).setLevel(level)
+
+    listener.start()
+    if not level_known:
+        logger.warning("⚠️  Unknown LOG_LEVEL %r, using INFO", LOG_LEVEL)
+    return queue_handler, listener
+
+
+def stop_logging(queue_handler: logging.Handler, listener: logging.handlers.QueueListener):
+    """Detach the queue handler and flush remaining records"""
+    logging.getLogger().removeHandler(queue_handler)
+    listener.stop()
+
+
+# Mic frames held for Gemini before the oldest is dropped. The browser sends
+# 4096-sample frames (~256ms at 16kHz), so this is about two seconds of audio.
+AUDIO_QUEUE_MAX_CHUNKS = 8
+
+# Frames waiting to go to the browser before the oldest audio frame is
+# dropped (~5 seconds of Gemini's ~20ms audio chunks)
+OUTGOING_QUEUE_MAX_MESSAGES = 256
+
+
+def to_json(message: dict) -> str:
+    """Serialize a control message for a text frame"""
+    return orjson.dumps(message).decode("utf-8")
+
+
+def put_nowait_dropping_oldest(target: asyncio.Queue, item):
+    """Queue item without blocking; if the queue is full, drop its oldest entry"""
+    try:
+        target.put_nowait(item)
+    except asyncio.QueueFull:
+        target.get_nowait()
+        target.put_nowait(item)
+
+
+def drop_oldest_audio(frames: deque) -> bool:
+    """
+    Remove the oldest MSG_AUDIO frame from frames. Control messages and
+    per-turn WAV headers are never dropped; returns False if no audio was queued.
+    """
+    for index, frame in enumerate(frames):
+        if isinstance(frame, bytes) and frame[:1] == MSG_AUDIO:
+            del frames[index]
+            return True
+    return False
+
+
+# Static control messages, serialized once
+MSG_ASSISTANT_SILENT = to_json({"type": "assistant_silent"})
+MSG_INTERRUPTED = to_json({"type": "interrupted"})
+MSG_SESSION_STARTED = to_json({"type": "session_started"})
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler"""
-    print(f"🚀 Her Voice Server starting on {HOST}:{PORT}")
+    queue_handler, listener = start_logging()
+    logger.info("🚀 Her Voice Server starting on %s:%s", HOST, PORT)
     if not GEMINI_API_KEY:
-        print("⚠️  Warning: GEMINI_API_KEY not set. Set it in .env or environment.")
-    yield
-    print("👋 Her Voice Server shutting down")
+        logger.warning("⚠️  Warning: GEMINI_API_KEY not set. Set it in .env or environment.")
+    try:
+        yield
+    finally:
+        logger.info("👋 Her Voice Server shutting down")
+        stop_logging(queue_handler, listener)
 
 
 app = FastAPI(
@@ -75,18 +172,22 @@ async def websocket_endpoint(websocket: WebSocket):
     """
     await websocket.accept()
 
-    print(f"🔌 Client connected")
+    logger.info("🔌 Client connected")
 
     if not GEMINI_API_KEY:
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(to_json({
             "type": "error",
             "message": "GEMINI_API_KEY not configured on server"
         }))
         await websocket.close(code=1011, reason="API key not configured")
         return
 
-    # Queue for sending audio to Gemini
-    audio_queue: asyncio.Queue = asyncio.Queue()
+    # Queue for sending audio to Gemini (bounded; stale mic audio is dropped)
+    audio_queue: asyncio.Queue = asyncio.Queue(maxsize=AUDIO_QUEUE_MAX_CHUNKS)
+
+    # Frames for the browser (str = text, bytes = binary), drained by one sender task
+    outgoing: deque = deque()
+    outgoing_ready = asyncio.Event()
 
     # Shutdown event for clean termination
     shutdown_event = asyncio.Event()
@@ -94,81 +195,95 @@ async def websocket_endpoint(websocket: WebSocket):
     # Track if we're still connected
     is_connected = True
     gemini_task: Optional[asyncio.Task] = None
+    sender_task: Optional[asyncio.Task] = None
     audio_chunk_count = 0
 
-    # Buffer to accumulate audio chunks for smoother playback
-    audio_buffer = bytearray()
-    BUFFER_TARGET_SIZE = 48000  # ~1 second of audio at 24kHz 16-bit mono
+    # Whether the WAV header has been sent for the current turn
+    turn_audio_started = False
 
-    async def send_log(message: str, level: str = "info"):
-        """Send a log message to the client"""
+    def send_to_client(message):
+        """Queue a frame for the browser; never waits on the client's network"""
         if not is_connected:
             return
-        try:
-            await websocket.send_text(json.dumps({
-                "type": "server_log",
-                "message": message,
-                "level": level
-            }))
-        except:
-            pass
 
-    async def handle_gemini_response(response_type: str, data):
+        # When the browser falls behind, shed stale audio; if only control
+        # frames are queued, let the queue grow rather than lose one
+        if len(outgoing) >= OUTGOING_QUEUE_MAX_MESSAGES:
+            drop_oldest_audio(outgoing)
+
+        outgoing.append(message)
+        outgoing_ready.set()
+
+    async def client_sender():
+        """Send queued frames to the browser in order"""
+        nonlocal is_connected
+
+        while True:
+            if not outgoing:
+                outgoing_ready.clear()
+                await outgoing_ready.wait()
+                continue
+
+            message = outgoing.popleft()
+            try:
+                if isinstance(message, bytes):
+                    await websocket.send_bytes(message)
+                else:
+                    await websocket.send_text(message)
+            except Exception as e:
+                logger.warning("Error sending to client: %s", e)
+                is_connected = False
+                break
+
+    async def send_log(message: str, level: str = "info"):
+        """Send a log message to the client"""
+        send_to_client(to_json({
+            "type": "server_log",
+            "message": message,
+            "level": level
+        }))
+
+    def handle_gemini_response(response_type: str, data):
         """Handle responses from Gemini and forward to client"""
-        nonlocal is_connected, audio_chunk_count, audio_buffer
+        nonlocal audio_chunk_count, turn_audio_started
 
         if not is_connected:
             return
 
-        try:
-            if response_type == "audio":
-                audio_chunk_count += 1
-                # Log first chunk to debug format
-                if audio_chunk_count == 1:
-                    print(f"🔊 First audio chunk: {len(data)} bytes")
-
-                # Accumulate audio in buffer
-                audio_buffer.extend(data)
-
-                # Send when buffer is large enough
-                if len(audio_buffer) >= BUFFER_TARGET_SIZE:
-                    wav_data = pcm_to_wav(bytes(audio_buffer), sample_rate=OUTPUT_SAMPLE_RATE)
-                    await websocket.send_text(json.dumps({
-                        "type": "audio",
-                        "data": base64.b64encode(wav_data).decode("utf-8")
-                    }))
-                    audio_buffer = bytearray()
-
-            elif response_type == "text":
-                await websocket.send_text(json.dumps({
-                    "type": "transcript",
-                    "text": data,
-                    "speaker": "assistant"
-                }))
-
-            elif response_type == "turn_complete":
-                # Flush any remaining audio in buffer
-                if len(audio_buffer) > 0:
-                    wav_data = pcm_to_wav(bytes(audio_buffer), sample_rate=OUTPUT_SAMPLE_RATE)
-                    await websocket.send_text(json.dumps({
-                        "type": "audio",
-                        "data": base64.b64encode(wav_data).decode("utf-8")
-                    }))
-                    audio_buffer = bytearray()
-                await websocket.send_text(json.dumps({"type": "assistant_silent"}))
-
-            elif response_type == "interrupted":
-                await websocket.send_text(json.dumps({"type": "interrupted"}))
-
-            elif response_type == "error":
-                await websocket.send_text(json.dumps({
-                    "type": "error",
-                    "message": data
-                }))
+        if response_type == "audio":
+            audio_chunk_count += 1
+            # Log first chunk to debug format
+            if audio_chunk_count == 1:
+                logger.debug("🔊 First audio chunk: %d bytes", len(data))
+
+            # Header once per turn, then raw PCM as it arrives
+            if not turn_audio_started:
+                send_to_client(AUDIO_START_FRAME)
+                turn_audio_started = True
+
+            # Prepending the tag is the only copy between Gemini and the socket
+            send_to_client(MSG_AUDIO + data)
+
+        elif response_type == "text":
+            send_to_client(to_json({
+                "type": "transcript",
+                "text": data,
+                "speaker": "assistant"
+            }))
 
-        except Exception as e:
-            print(f"Error sending to client: {e}")
-            is_connected = False
+        elif response_type == "turn_complete":
+            turn_audio_started = False
+            send_to_client(MSG_ASSISTANT_SILENT)
+
+        elif response_type == "interrupted":
+            turn_audio_started = False
+            send_to_client(MSG_INTERRUPTED)
+
+        elif response_type == "error":
+            send_to_client(to_json({
+                "type": "error",
+                "message": data
+            }))
 
     async def run_gemini():
         """Run the Gemini session"""
@@ -182,64 +297,83 @@ async def websocket_endpoint(websocket: WebSocket):
             await send_log("Gemini session ended", "warn")
         except Exception as e:
             error_msg = str(e)
-            print(f"Gemini session error: {e}")
+            logger.error("Gemini session error: %s", e)
             await send_log(f"Gemini error: {error_msg}", "error")
-            await handle_gemini_response("error", error_msg)
+            handle_gemini_response("error", error_msg)
 
-    # Start Gemini session
+    # Start the client sender and the Gemini session
+    sender_task = asyncio.create_task(client_sender())
     gemini_task = asyncio.create_task(run_gemini())
 
     # Notify client
-    await websocket.send_text(json.dumps({
-        "type": "session_started"
-    }))
+    send_to_client(MSG_SESSION_STARTED)
 
     try:
         # Handle incoming messages from client
         while is_connected:
             message = await websocket.receive()
 
+            # Binary data = audio from microphone (the hot path, checked first)
+            audio = message.get("bytes")
+            if audio is not None:
+                put_nowait_dropping_oldest(audio_queue, audio)
+                continue
+
             if message["type"] == "websocket.disconnect":
                 break
 
-            # Binary data = audio from microphone
-            if "bytes" in message:
-                await audio_queue.put(message["bytes"])
-
             # Text data = control messages
-            elif "text" in message:
+            text = message.get("text")
+            if text is not None:
                 try:
-                    data = json.loads(message["text"])
+                    data = orjson.loads(text)
                     msg_type = data.get("type")
 
                     if msg_type == "end_session":
                         break
 
-                except json.JSONDecodeError:
-                    print(f"Invalid JSON: {message['text']}")
+                except orjson.JSONDecodeError:
+                    logger.warning("Invalid JSON: %s", text)
 
     except WebSocketDisconnect:
-        print("🔌 Client disconnected")
+        logger.info("🔌 Client disconnected")
     except Exception as e:
-        print(f"❌ WebSocket error: {e}")
+        logger.error("❌ WebSocket error: %s", e)
     finally:
         is_connected = False
 
         # Signal Gemini task to stop
         shutdown_event.set()
-        await audio_queue.put(None)
+        put_nowait_dropping_oldest(audio_queue, None)
 
-        # Cancel Gemini task if still running
-        if gemini_task and not gemini_task.done():
-            gemini_task.cancel()
-            try:
-                await gemini_task
-            except asyncio.CancelledError:
-                pass
+        # Cancel Gemini and sender tasks if still running
+        for task in (gemini_task, sender_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
 
-        print("🔌 Session ended")
+        logger.info("🔌 Session ended")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=HOST, port=PORT)
+
+    # uvloop (installed by uvicorn[standard]) isn't available on Windows
+    try:
+        import uvloop  # noqa: F401
+        loop = "uvloop"
+    except ImportError:
+        loop = "asyncio"
+
+    uvicorn.run(
+        app,
+        host=HOST,
+        port=PORT,
+        loop=loop,
+        http="httptools",
+        ws="websockets",
+        log_level="warning"
+    )
@@ -22,9 +22,8 @@ class HerVoiceApp {
         this.isPushToTalk = false;
         this.pttKey = ' ';  // Spacebar
 
-        // Audio playback queue
-        this.audioQueue = [];
-        this.isPlaying = false;
+        // Audio playback (sample rate comes from each turn's WAV header)
+        this.outputSampleRate = 24000;
 
         // Store last audio for replay
         this.lastAudioData = null;
@@ -167,9 +166,8 @@ class HerVoiceApp {
             this.connection.disconnect();
         }
 
-        this.audioQueue = [];
+        this.visualizer.stopPlayback();
         this.allAudioChunks = [];
-        this.isPlaying = false;
 
         await new Promise(resolve => setTimeout(resolve, 500));
 
@@ -235,7 +233,7 @@ class HerVoiceApp {
         if (!this.isMicActive || !this.connection?.isConnected()) return;
 
         // Interrupt if speaking
-        if (this.isPlaying || this.audioQueue.length > 0) {
+        if (this.visualizer.isPlaying()) {
             this.interruptPlayback();
         }
 
@@ -253,20 +251,10 @@ class HerVoiceApp {
     interruptPlayback() {
         console.log('⚡ Interrupting...');
 
-        this.audioQueue = [];
-        this.isPlaying = false;
-
+        this.visualizer.stopPlayback();
         this.visualizer.setActive(false);
         this.visualizer.setThinking(false);
 
-        if (this.visualizer.analyser) {
-            try {
-                this.visualizer.analyser.disconnect();
-            } catch (e) {
-                // Already disconnected
-            }
-        }
-
         this.logTranscript('system', '⚡ Interrupted');
     }
 
@@ -315,6 +303,10 @@ class HerVoiceApp {
                 this.stopMicrophone();
             },
 
+            onAudioStart: (header) => {
+                this.startAudioTurn(header);
+            },
+
             onAudio: (audioData) => {
                 this.queueAudio(audioData);
             },
@@ -335,9 +327,13 @@ class HerVoiceApp {
                     const scheduledEnd = this.visualizer?.nextChunkTime || 0;
                     const now = ctx?.currentTime || 0;
 
-                    if (this.isPlaying || this.audioQueue.length > 0 || (scheduledEnd > now + 0.5)) {
+                    if (scheduledEnd > now + 0.5) {
                         setTimeout(waitForAudioFinish, 200);
                     } else {
+                        const underruns = this.visualizer?.bufferUnderruns || 0;
+                        if (underruns > 0) {
+                            console.log(`🔈 Playback buffer underruns this turn: ${underruns}`);
+                        }
                         setTimeout(() => {
                             this.setStatus('listening');
                             this.visualizer.setActive(false);
@@ -460,10 +456,17 @@ class HerVoiceApp {
         this.isMicActive = false;
     }
 
+    startAudioTurn(header) {
+        // Bytes 24-27 of a WAV header hold the sample rate
+        const view = new DataView(header.buffer, header.byteOffset, header.byteLength);
+        this.outputSampleRate = view.getUint32(24, true);
+        this.allAudioChunks = [header];
+        this.visualizer.resetStream();
+    }
+
     queueAudio(audioData) {
         this.allAudioChunks.push(audioData);
-        this.audioQueue.push(audioData);
-        this.processAudioQueue();
+        this.visualizer.playPcm(audioData, this.outputSampleRate);
     }
 
     combineAudioChunks() {
@@ -481,6 +484,13 @@ class HerVoiceApp {
             offset += chunk.byteLength;
         }
 
+        // The streamed header carries placeholder sizes; fill in the real ones
+        if (totalLength >= 44) {
+            const view = new DataView(combined.buffer);
+            view.setUint32(4, totalLength - 8, true);
+            view.setUint32(40, totalLength - 44, true);
+        }
+
         const chunkCount = this.allAudioChunks.length;
         this.lastAudioData = combined.buffer;
         this.allAudioChunks = [];
@@ -507,24 +517,6 @@ class HerVoiceApp {
         }
     }
 
-    async processAudioQueue() {
-        if (this.isPlaying || this.audioQueue.length === 0) return;
-
-        this.isPlaying = true;
-
-        while (this.audioQueue.length > 0) {
-            const audioData = this.audioQueue.shift();
-
-            try {
-                await this.visualizer.playAudio(audioData);
-            } catch (error) {
-                console.error('Error playing audio:', error);
-            }
-        }
-
-        this.isPlaying = false;
-    }
-
     showTranscript(transcript) {
         if (!this.transcriptOverlay) return;
 
@@ -19,6 +19,9 @@ export class AudioVisualizer {
         this.audioContext = null;
         this.thinkingPhase = 0;
         this.nextChunkTime = 0;
+        this.scheduledSources = new Set();
+        this.streamActive = false;
+        this.bufferUnderruns = 0;
 
         this.logicalWidth = 0;
         this.logicalHeight = 0;
@@ -34,7 +37,8 @@ export class AudioVisualizer {
             lerpFactor: 0.25,
             amplitudeScale: 8.0,
             idleAmplitude: 0.02,
-            idleSpeed: 0.001
+            idleSpeed: 0.001,
+            streamBufferMs: 80               // Jitter buffer before stream playback starts
         };
 
         this.idlePhase = 0;
@@ -81,22 +85,8 @@ export class AudioVisualizer {
 
             const gainNode = ctx.createGain();
 
-            if (!this.analyser) {
-                this.createAnalyser();
-            }
-
-            // Low-pass filter to reduce high-end artifacts
-            if (!this.lowPassFilter) {
-                this.lowPassFilter = ctx.createBiquadFilter();
-                this.lowPassFilter.type = 'lowpass';
-                this.lowPassFilter.frequency.value = 8000;
-                this.lowPassFilter.Q.value = 0.5;
-            }
-
             source.connect(gainNode);
-            gainNode.connect(this.lowPassFilter);
-            this.lowPassFilter.connect(this.analyser);
-            this.analyser.connect(ctx.destination);
+            this.connectOutput(gainNode);
 
             // Crossfade parameters
             const fadeTime = 0.05;
@@ -134,6 +124,113 @@ export class AudioVisualizer {
         }
     }
 
+    /**
+     * Schedule a chunk of raw 16-bit mono PCM for gapless playback.
+     * Contiguous stream chunks are played back-to-back without crossfade.
+     * Playback starts streamBufferMs after the first chunk (and after any
+     * underrun) so network jitter doesn't cause audible gaps.
+     */
+    playPcm(pcmData, sampleRate) {
+        const ctx = this.getAudioContext();
+
+        if (ctx.state === 'suspended') {
+            ctx.resume();
+        }
+
+        const bytes = pcmData instanceof Uint8Array ? pcmData : new Uint8Array(pcmData);
+        const sampleCount = bytes.byteLength >> 1;
+        if (sampleCount === 0) return;
+
+        // DataView handles unaligned offsets and is explicit about endianness
+        const view = new DataView(bytes.buffer, bytes.byteOffset, sampleCount * 2);
+        const audioBuffer = ctx.createBuffer(1, sampleCount, sampleRate);
+        const channel = audioBuffer.getChannelData(0);
+        for (let i = 0; i < sampleCount; i++) {
+            channel[i] = view.getInt16(i * 2, true) / 0x8000;
+        }
+
+        const source = ctx.createBufferSource();
+        source.buffer = audioBuffer;
+        this.connectOutput(source);
+
+        let startTime = this.nextChunkTime;
+        if (startTime <= ctx.currentTime) {
+            // Ran dry mid-stream: count it, then re-prime the jitter buffer
+            if (this.streamActive) {
+                this.bufferUnderruns++;
+            }
+            startTime = ctx.currentTime + this.config.streamBufferMs / 1000;
+        }
+        this.streamActive = true;
+        this.nextChunkTime = startTime + audioBuffer.duration;
+        this.active = true;
+
+        this.scheduledSources.add(source);
+        source.onended = () => {
+            this.scheduledSources.delete(source);
+            if (this.scheduledSources.size === 0) {
+                this.active = false;
+            }
+        };
+
+        source.start(startTime);
+    }
+
+    /**
+     * Mark the start of a new stream so its first chunk isn't counted as an underrun
+     */
+    resetStream() {
+        this.streamActive = false;
+        this.bufferUnderruns = 0;
+    }
+
+    /**
+     * Whether any scheduled audio has yet to finish playing
+     */
+    isPlaying() {
+        return !!this.audioContext && this.nextChunkTime > this.audioContext.currentTime;
+    }
+
+    /**
+     * Stop all scheduled stream audio immediately (used on interrupt)
+     */
+    stopPlayback() {
+        for (const source of this.scheduledSources) {
+            try {
+                source.stop();
+            } catch (e) {
+                // Already stopped
+            }
+        }
+        this.scheduledSources.clear();
+        this.nextChunkTime = 0;
+        this.streamActive = false;
+        this.active = false;
+    }
+
+    /**
+     * Route a node through the low-pass filter and analyser to the speakers
+     */
+    connectOutput(node) {
+        const ctx = this.getAudioContext();
+
+        if (!this.analyser) {
+            this.createAnalyser();
+        }
+
+        // Low-pass filter to reduce high-end artifacts
+        if (!this.lowPassFilter) {
+            this.lowPassFilter = ctx.createBiquadFilter();
+            this.lowPassFilter.type = 'lowpass';
+            this.lowPassFilter.frequency.value = 8000;
+            this.lowPassFilter.Q.value = 0.5;
+        }
+
+        node.connect(this.lowPassFilter);
+        this.lowPassFilter.connect(this.analyser);
+        this.analyser.connect(ctx.destination);
+    }
+
     connectToStream() {
         const ctx = this.getAudioContext();
 
@@ -3,6 +3,10 @@
  * Handles bidirectional audio streaming with the backend
  */
 
+// Binary frame type tags (first byte of every binary message)
+const MSG_AUDIO = 0x01;        // raw 16-bit PCM
+const MSG_AUDIO_START = 0x02;  // WAV header for a new turn
+
 export class VoiceConnection {
     constructor(options = {}) {
         this.url = options.url || 'ws://localhost:8765';
@@ -15,6 +19,7 @@ export class VoiceConnection {
         // Callbacks
         this.onConnected = options.onConnected || (() => {});
         this.onDisconnected = options.onDisconnected || (() => {});
+        this.onAudioStart = options.onAudioStart || (() => {});
         this.onAudio = options.onAudio || (() => {});
         this.onTranscript = options.onTranscript || (() => {});
         this.onError = options.onError || (() => {});
@@ -67,9 +72,23 @@ export class VoiceConnection {
     }
 
     handleMessage(event) {
-        // Binary data = audio from assistant
+        // Binary data = tagged audio frames from assistant
         if (event.data instanceof ArrayBuffer) {
-            this.onAudio(event.data);
+            const frame = new Uint8Array(event.data);
+            const payload = frame.subarray(1);
+
+            switch (frame[0]) {
+                case MSG_AUDIO:
+                    this.onAudio(payload);
+                    break;
+
+                case MSG_AUDIO_START:
+                    this.onAudioStart(payload);
+                    break;
+
+                default:
+                    console.log('Unknown binary frame type:', frame[0]);
+            }
             return;
         }
 
@@ -78,17 +97,6 @@ export class VoiceConnection {
             const message = JSON.parse(event.data);
 
             switch (message.type) {
-                case 'audio':
-                    if (message.data) {
-                        const binaryString = atob(message.data);
-                        const bytes = new Uint8Array(binaryString.length);
-                        for (let i = 0; i < binaryString.length; i++) {
-                            bytes[i] = binaryString.charCodeAt(i);
-                        }
-                        this.onAudio(bytes.buffer);
-                    }
-                    break;
-
                 case 'transcript':
                     this.onTranscript(message);
                     break;